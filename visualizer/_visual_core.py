@@ -0,0 +1,96 @@
+"""Hot emission loops for visual.py.
+
+Kept free of gdb imports so the module can optionally be compiled with
+Cython (python setup.py build_ext --inplace); the built extension
+shadows this file and visual.py falls back to it unchanged otherwise.
+"""
+
+import sys
+
+# fixed cell fragments, interned and appended as-is so no per-cell
+# string is ever assembled
+cell_pfx = sys.intern('<td class="data">')
+cell_hl_a = sys.intern('<td class="data hl" style="--color: ')
+cell_hl_b = sys.intern('">')
+cell_sfx = sys.intern('</td>')
+head_cell = '<th class="heading">%d</th>'
+idx_cell = '<td class="heading">%d</td>'
+
+# header cells and row indices recur with the same shape on every step,
+# so build them once per width
+_header_cache: dict[int, str] = {}
+_idx_cache: dict[int, str] = {}
+
+def header_row(n: int) -> str:
+    s = _header_cache.get(n)
+    if s is None:
+        s = "".join(head_cell % i for i in range(n))
+        _header_cache[n] = s
+    return s
+
+# DP shapes stay fixed while stepping, so for small tables generate an
+# emitter with the loops unrolled once per shape and reuse it
+_spec_max = 64
+_emit_cache: dict[tuple[int, int], object] = {}
+
+def _specialize(d1: int, d2: int):
+    lines = ["def emit(m, his, write):", " g = his.get", " w = write"]
+    add = lines.append
+    key = 0
+    for j in range(d2):
+        add(" w('<tr>')")
+        add(" w(%r)" % (idx_cell % j))
+        for i in range(d1):
+            add(" c = g(%d)" % key)
+            add(" if c is None: w(pfx)")
+            add(" else: w(hla); w(c); w(hlb)")
+            add(" w(m[%d]); w(sfx)" % key)
+            key += 1
+        add(" w('</tr>')")
+    ns = {"pfx": cell_pfx, "hla": cell_hl_a, "hlb": cell_hl_b, "sfx": cell_sfx}
+    exec(compile("\n".join(lines), "<emit %dx%d>" % (d1, d2), "exec"), ns)
+    return ns["emit"]
+
+def emit_table_2d(flat: list, d1: int, d2: int, his: dict, write) -> None:
+    """Emit a d1 x d2 table stored as one pre-stringified list in
+    emission order, so a cell's flat index is also its highlight key
+    (j*d1 + i). write is the caller's chunk-list append."""
+    if 0 < d1 <= _spec_max and d2 <= _spec_max:
+        fn = _emit_cache.get((d1, d2))
+        if fn is None:
+            fn = _emit_cache[(d1, d2)] = _specialize(d1, d2)
+        fn(flat, his, write)
+        return
+    get = his.get
+    for j in range(d2):
+        write("<tr>")
+        idx = _idx_cache.get(j)
+        if idx is None:
+            idx = _idx_cache[j] = idx_cell % j
+        write(idx)
+        base = j * d1
+        for key in range(base, base + d1):
+            col = get(key)
+            if col is not None:
+                write(cell_hl_a)
+                write(col)
+                write(cell_hl_b)
+            else:
+                write(cell_pfx)
+            write(flat[key])
+            write(cell_sfx)
+        write("</tr>")
+
+def emit_table_1d(a: list, his: dict, write) -> None:
+    write("<tr>")
+    for i, val in enumerate(a):
+        col = his.get(i)
+        if col is not None:
+            write(cell_hl_a)
+            write(col)
+            write(cell_hl_b)
+        else:
+            write(cell_pfx)
+        write(str(val))
+        write(cell_sfx)
+    write("</tr>")
@@ -0,0 +1,8 @@
+from setuptools import setup
+from Cython.Build import cythonize
+
+# optional: compile the emit loops, visual.py works without it
+setup(
+    name="visual-core",
+    ext_modules=cythonize(["_visual_core.py"], language_level=3),
+)
@@ -1,19 +1,116 @@
 from typing import TextIO
 import gdb
 import graphviz
-import math
+import os
+import re
+import struct
+import sys
 from graphviz.graphs import Digraph
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_here = os.path.dirname(os.path.abspath(__file__))
+if _here not in sys.path:
+    sys.path.insert(0, _here)
+import _visual_core as core
+
+int_fmts = {1: "b", 2: "h", 4: "i", 8: "q"}
+flt_fmts = {4: "f", 8: "d"}
+
+def read_primitive_array(addr: int, count: int, target: gdb.Type) -> list | None:
+    """Fetch a whole primitive array in one read_memory instead of one
+    value fetch per element."""
+    if target.code == gdb.TYPE_CODE_FLT:
+        fmt = flt_fmts.get(target.sizeof)
+    elif target.code in (gdb.TYPE_CODE_INT, gdb.TYPE_CODE_CHAR):
+        fmt = int_fmts.get(target.sizeof)
+        if fmt and not getattr(target, "is_signed", "unsigned" not in str(target)):
+            fmt = fmt.upper()
+    else:
+        fmt = None
+    if fmt is None:
+        return None
+    mv = gdb.selected_inferior().read_memory(addr, count * target.sizeof)
+    end = "<" if sys.byteorder == "little" else ">"
+    return list(struct.unpack(f"{end}{count}{fmt}", mv.tobytes()))
+
+def stringify_row(r: list) -> list[str]:
+    """Format a whole numeric row in one numpy call when available;
+    rows are homogeneous after to_native, so checking the first
+    element is enough."""
+    if np is not None and r and type(r[0]) in (int, float):
+        return np.char.mod("%s", np.asarray(r)).tolist()
+    return [str(v) for v in r]
+
+def to_native(vals: list, target: gdb.Type) -> list:
+    """str() on a gdb.Value re-enters the pretty-printer; numeric
+    elements format much faster once coerced to native int/float."""
+    code = target.strip_typedefs().code
+    if code in (gdb.TYPE_CODE_INT, gdb.TYPE_CODE_CHAR):
+        return [int(v) for v in vals]
+    if code == gdb.TYPE_CODE_FLT:
+        return [float(v) for v in vals]
+    return vals
+
+def vector_snapshot(expr: gdb.Value) -> list | None:
+    """Snapshot a libstdc++ std::vector straight from its contiguous
+    [_M_start, _M_finish) buffer instead of walking the printer's
+    per-element children iterator."""
+    try:
+        impl = expr["_M_impl"]
+        start = impl["_M_start"]
+        count = int(impl["_M_finish"] - start)
+    except gdb.error:
+        return None
+    if count <= 0:
+        return []
+    target = start.type.target()
+    try:
+        if (vals := read_primitive_array(int(start), count, target)) is not None:
+            return vals
+    except gdb.error:
+        pass
+    return to_native([(start + i).dereference() for i in range(count)], target)
+
+# display_hint is fixed per pretty-printer class, so look it up once
+_missing = object()
+_hint_cache: dict[type, str | None] = {}
+
 def as_list(expr: gdb.Value) -> list[gdb.Value] | None:
+    # elements may already be native ints/floats from the bulk-read and
+    # to_native paths; default_visualizer only accepts gdb.Value
+    if not isinstance(expr, gdb.Value):
+        return None
     if vz := gdb.default_visualizer(expr):
-        if vz.display_hint() == "array":
-            return list(map(lambda x: x[1], vz.children()))
-        if vz.display_hint() == "string":
+        cls = type(vz)
+        hint = _hint_cache.get(cls, _missing)
+        if hint is _missing:
+            hint = vz.display_hint()
+            _hint_cache[cls] = hint
+        if hint == "array":
+            if cls.__module__.startswith(("libstdcxx", "libcxx")):
+                if (vals := vector_snapshot(expr)) is not None:
+                    return vals
+            vals = [c[1] for c in vz.children()]
+            if vals and (t := getattr(vals[0], "type", None)):
+                return to_native(vals, t)
+            return vals
+        if hint == "string":
             return vz.to_string().value().string()
     if expr.type.code == gdb.TYPE_CODE_ARRAY:
+        target = expr.type.target()
         # sizeof(a) / sizeof(a[0])
-        size = math.floor(expr.type.sizeof / expr.type.target().sizeof)
-        return [expr[i] for i in range(size)]
+        size = expr.type.sizeof // target.sizeof
+        if expr.address is not None:
+            try:
+                if (vals := read_primitive_array(int(expr.address), size, target)) is not None:
+                    return vals
+            except gdb.error:
+                pass
+        return to_native([expr[i] for i in range(size)], target)
 
 class GraphViz(gdb.Command):
     """Visualize a graph into a dot file\nUsage: graph-viz EXPR FILE """
@@ -31,15 +128,14 @@ class GraphViz(gdb.Command):
         gr.attr("node", fontcolor="#cccccc", color="#cccccc", fontname="Input Mono")
         gr.attr("edge", color="#999999")
         gr.attr("graph", bgcolor="#191919")
+        lines = []
         for u, vs in enumerate(g):
-            gr.node(str(u))
-            for v in as_list(vs):
-                gr.edge(str(u), str(v))
+            lines.append("\t%d\n" % u)
+            lines.extend("\t%d -> %d\n" % (u, int(v)) for v in as_list(vs))
+        gr.body.extend(lines)
 
         gr.render(outfile=file)
 
-GraphViz()
-
 tbl_style = """
 <style>
   html,
@@ -94,6 +190,10 @@ tbl_style = """
 
 colors = ["#77f5", "#af75", "#f7f5", "#f775", "#7df5", "#ff75"]
 
+label_tmpl = '<span class="label" style="--color: %s">%s</span>'
+
+idx_pair_re = re.compile(r"\{\s*(\d+)\s*,\s*(\d+)\s*\}$")
+
 # draw a table
 # TODO: 3d dp?
 class TableViz(gdb.Command):
@@ -102,7 +202,8 @@ class TableViz(gdb.Command):
         super(TableViz, self).__init__("tab-viz", gdb.COMMAND_USER, gdb.COMPLETE_EXPRESSION)
 
     def invoke(self, argument: str, from_tty: bool) -> None:
-        [expr_text, *his, file] = argument.split(' ')
+        head, file = argument.rsplit(' ', 1)
+        [expr_text, *his] = head.split(' ')
         try:
             expr = gdb.parse_and_eval(expr_text)
         except:
@@ -113,6 +214,13 @@ class TableViz(gdb.Command):
             return
         
         def get_idx(expr: str):
+            # literal indices don't need a GDB round-trip
+            try:
+                return int(expr, 0)
+            except ValueError:
+                pass
+            if m := idx_pair_re.match(expr):
+                return (int(m.group(1)), int(m.group(2)))
             try:
                 x = gdb.parse_and_eval(expr)
                 if x.type.code == gdb.TYPE_CODE_INT:
@@ -129,54 +237,46 @@ class TableViz(gdb.Command):
                 curr_colors[var] = colors[len(curr_colors)]
             return curr_colors[var]
 
-        his = {get_idx(x):getcolor(x) for x in his}
+        # dedupe tokens so each one costs at most one parse_and_eval;
+        # no caching across invocations, the values change while stepping
+        his = {get_idx(x):getcolor(x) for x in dict.fromkeys(his)}
+
+        chunks: list[str] = []
+        write = chunks.append
+        write(tbl_style)
+        write("<table>")
+        write("<caption>%s</caption>" % expr_text)
+        d1 = len(a)
+        mat = [as_list(x) or [] for x in a]
+        d2 = max((len(r) for r in mat), default=0) or None
+        if d2 is not None:
+            write("<tr>")
+            write("<th></th>")
+            write(core.header_row(d1))
+            write("</tr>")
 
+            srows = [stringify_row(r) + [""] * (d2 - len(r)) for r in mat]
+            flat = [r[j] for j in range(d2) for r in srows]
+            his2 = {k[1] * d1 + k[0]: col for k, col in his.items()
+                    if isinstance(k, tuple)
+                    and 0 <= k[0] < d1 and 0 <= k[1] < d2}
+            core.emit_table_2d(flat, d1, d2, his2, write)
+        else:
+            write("<tr>")
+            write(core.header_row(len(a)))
+            write("</tr>")
+
+            core.emit_table_1d(a, his, write)
+        write("</table>")
+        write('<div class="labels">')
+        for expr, color in curr_colors.items():
+            write(label_tmpl % (color, expr))
+        write('</div>')
         with open(file, "w") as f:
-            f.write(tbl_style)
-            f.write("<table>")
-            f.write(f"<caption>{expr_text}</caption>")
-            d1 = len(a)
-            d2 = None
-            for x in a:
-                if val := as_list(x):
-                    d2 = max(len(val), d2 or 0)
-            if d2 is not None:
-                mat = [as_list(x) for x in a]
-
-                f.write("<tr>")
-                f.write("<th></th>")
-                for i in range(len(mat)):
-                    f.write(f'<th class="heading">{i}</th>')
-                f.write("</tr>")
-
-                for j in range(d2):
-                    f.write("<tr>")
-                    f.write(f'<td class="heading">{j}</td>')
-                    for i in range(d1):
-                        val = str(mat[i][j]) if len(mat[i]) > j else ""
-                        if (i, j) in his:
-                            col = his[(i, j)]
-                            f.write(f'<td class="data hl" style="--color: {col}">{val}</td>')
-                        else:
-                            f.write(f'<td class="data"">{val}</td>')
-                    f.write("</tr>")
-            else:
-                f.write("<tr>")
-                for i in range(len(a)):
-                    f.write(f'<th class="heading">{i}</th>')
-                f.write("</tr>")
-
-                f.write("<tr>")
-                for (i, val) in enumerate(a):
-                    if i in his:
-                        col = his[i]
-                        f.write(f'<td class="data hl" style="--color: {col}">{val}</td>')
-                    else:
-                        f.write(f'<td class="data">{val}</td>')
-                f.write("</tr>")
-            f.write("</table>")
-            f.write('<div class="labels">');
-            for expr, color in curr_colors.items():
-                f.write(f'<span class="label" style="--color: {color}">{expr}</span>')
-            f.write('</div>');
-TableViz()
+            f.writelines(chunks)
+
+# re-sourcing from .gdbinit shouldn't register the commands again
+if not getattr(gdb, "_visual_loaded", False):
+    GraphViz()
+    TableViz()
+    gdb._visual_loaded = True